@@ -8,14 +8,21 @@ Endpoints:
 - POST /extract-pdf - Extract CV data from an uploaded PDF
 """
 
+import asyncio
+import json
 import logging
+import os
+import re
+from urllib.parse import quote
 from fastapi import APIRouter, HTTPException, Request, UploadFile, File
-from fastapi.responses import Response
-from pydantic import BaseModel, Field, field_validator
-from typing import Literal, Optional
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, field_validator
+from typing import Annotated, Literal, Optional, TypedDict
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.background import BackgroundTask
 
+from services.ai_service import AIService
 from services.cv_service import CVService
 from services.cover_letter_service import CoverLetterService
 from services.pdf_extract_service import PDFExtractService
@@ -27,88 +34,105 @@ limiter = Limiter(key_func=get_remote_address)
 
 router = APIRouter(tags=["render"])
 
+# Each render starts its own RenderCV engine run. Queue bursts behind a fixed
+# number of slots instead of letting every request compete for the CPU.
+RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", str(os.cpu_count() or 2)))
+_render_slots = asyncio.Semaphore(RENDER_CONCURRENCY)
+
 
 # Request/Response Models
 
-class ExperienceEntry(BaseModel):
+class ExperienceEntry(TypedDict, total=False):
     """Work experience entry."""
-    company: str = ""
-    position: str = ""
-    start_date: str = ""
-    end_date: str = "present"
-    location: str = ""
-    summary: str = ""
-    highlights: list[str] = Field(default_factory=list)
+    company: str
+    position: str
+    start_date: str
+    end_date: str  # Missing means "present"
+    location: str
+    summary: str
+    highlights: list[str]
 
 
-class EducationEntry(BaseModel):
+class EducationEntry(TypedDict, total=False):
     """Education entry."""
-    institution: str = ""
-    area: str = ""
-    degree: str = ""
-    start_date: str = ""
-    end_date: str = ""
-    location: str = ""
-    summary: str = ""
-    highlights: list[str] = Field(default_factory=list)
+    institution: str
+    area: str
+    degree: str
+    start_date: str
+    end_date: str
+    location: str
+    summary: str
+    highlights: list[str]
 
 
-class SkillEntry(BaseModel):
+class SkillEntry(TypedDict, total=False):
     """Skill entry."""
-    label: str = ""
-    details: str = ""
+    label: str
+    details: str
 
 
-class ProjectEntry(BaseModel):
+class ProjectEntry(TypedDict, total=False):
     """Project entry."""
-    name: str = ""
-    date: str = ""
-    start_date: str = ""
-    end_date: str = ""
-    location: str = ""
-    url: str = ""
-    summary: str = ""
-    highlights: list[str] = Field(default_factory=list)
+    name: str
+    date: str
+    start_date: str
+    end_date: str
+    location: str
+    url: str
+    summary: str
+    highlights: list[str]
 
 
-class PublicationEntry(BaseModel):
+class PublicationEntry(TypedDict, total=False):
     """Publication entry."""
-    title: str = ""
-    authors: str | list[str] = ""  # Comma-separated string or list
-    journal: str = ""
-    date: str = ""
-    doi: Optional[str] = None
-    url: Optional[str] = None
-    summary: Optional[str] = None
+    title: str
+    authors: str | list[str]  # Comma-separated string or list
+    journal: str
+    date: str
+    doi: Optional[str]
+    url: Optional[str]
+    summary: Optional[str]
 
 
-class HonorEntry(BaseModel):
+class HonorEntry(TypedDict, total=False):
     """Honor/Award entry (bullet format)."""
-    bullet: str = ""
+    bullet: str
 
 
-class PatentEntry(BaseModel):
+class PatentEntry(TypedDict, total=False):
     """Patent entry (numbered format)."""
-    number: str = ""
+    number: str
 
 
-class TalkEntry(BaseModel):
+class TalkEntry(TypedDict, total=False):
     """Invited talk entry (reversed numbered format)."""
-    reversed_number: str = ""
+    reversed_number: str
+
+
+def _coerce_to_string(value: object) -> str:
+    """Coerce values such as a numeric phone from the frontend to a string."""
+    return str(value) if value is not None else ""
+
+
+PhoneText = Annotated[str, BeforeValidator(_coerce_to_string)]
 
 
 class DesignSettings(BaseModel):
     """Design customization settings."""
+    model_config = ConfigDict(defer_build=True)
+
     primaryColor: Optional[str] = None
     fontFamily: Optional[str] = None
 
 
 class CVData(BaseModel):
     """Complete CV data model."""
+    model_config = ConfigDict(defer_build=True, extra="ignore", revalidate_instances="never")
+
     name: str = "Your Name"
     headline: str = ""
     email: str = ""
-    phone: str = ""
+    phone: PhoneText = ""
     location: str = ""
     website: str = ""
     linkedin: str = ""
@@ -122,16 +146,12 @@ class CVData(BaseModel):
     honors: list[HonorEntry] = Field(default_factory=list)
     patents: list[PatentEntry] = Field(default_factory=list)
     talks: list[TalkEntry] = Field(default_factory=list)
-    
-    # Coerce phone to string since frontend may send numeric value
-    @field_validator('phone', mode='before')
-    @classmethod
-    def coerce_phone_to_string(cls, v):
-        return str(v) if v is not None else ""
 
 
 class RenderRequest(BaseModel):
     """Request model for CV rendering."""
+    model_config = ConfigDict(extra="ignore", revalidate_instances="never")
+
     cv_data: CVData
     theme: str = "classic"
     format: str = "png"  # 'png' or 'pdf'
@@ -173,16 +193,81 @@ class CoverLetterResponse(BaseModel):
     word_count: int
 
 
+def _cv_to_dict(cv: CVData) -> dict:
+    """Flatten CVData into a plain dict without a recursive model_dump().
+
+    Entry lists are validated as TypedDicts, so they are already plain dicts
+    and the model's ``__dict__`` is the raw payload. Empty strings and lists
+    are dropped; CVService reads every field with ``.get()`` and omits empty
+    values from the RenderCV structure anyway.
+    """
+    return {key: value for key, value in cv.__dict__.items() if value}
+
+
 # Endpoints
 
+# Themes are static for the lifetime of the process, so encode the payload once.
+_THEMES_BODY = json.dumps(
+    {
+        "themes": CVService.get_theme_metadata(),
+        "default": "classic",
+    }
+).encode("utf-8")
+
+
 @router.get("/themes")
 @limiter.limit("30/minute")
-async def get_themes(request: Request) -> dict:
+async def get_themes(request: Request) -> Response:
     """Get list of available CV themes."""
-    return {
-        "themes": CVService.get_theme_metadata(),
-        "default": "classic"
-    }
+    return Response(content=_THEMES_BODY, media_type="application/json")
+
+
+def _content_disposition(filename: str) -> str:
+    """Build an attachment header that survives non-Latin-1 CV names (RFC 6266/5987)."""
+    stem, _, extension = filename.rpartition(".")
+    ascii_stem = re.sub(r"[^A-Za-z0-9._-]+", "_", stem).strip("_") or "CV"
+    return (
+        f'attachment; filename="{ascii_stem}.{extension}"; '
+        f"filename*=UTF-8''{quote(filename)}"
+    )
+
+
+async def _do_render(render_request: RenderRequest, output_format: str) -> Response:
+    """Render the requested CV and stream it back in the given format."""
+    try:
+        cv_dict = _cv_to_dict(render_request.cv_data)
+        design_dict = render_request.design_settings.__dict__ if render_request.design_settings else None
+        # Rendering is blocking CPU and disk work; keep it off the event loop.
+        async with _render_slots:
+            file_path, filename, temp_dir = await asyncio.to_thread(
+                CVService.render_cv_file,
+                cv_data=cv_dict,
+                output_format=output_format,
+                theme=render_request.theme,
+                design_settings=design_dict,
+                section_order=render_request.section_order,
+            )
+        
+        try:
+            if output_format == "pdf":
+                media_type = "application/pdf"
+            else:
+                media_type = "image/png"
+
+            # Stream the rendered file from disk and drop the render directory
+            # once the body has been sent.
+            return FileResponse(
+                file_path,
+                media_type=media_type,
+                headers={"Content-Disposition": _content_disposition(filename)},
+                background=BackgroundTask(CVService.recycle_render_dir, temp_dir),
+            )
+        except Exception:
+            # The response never took ownership of the render directory
+            CVService.discard_render_dir(temp_dir)
+            raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/render")
@@ -196,31 +281,7 @@ async def render_cv(request: Request, render_request: RenderRequest) -> Response
     - **format**: Output format ('png' for preview, 'pdf' for download)
     - **design_settings**: Optional design customization (colors, fonts)
     """
-    try:
-        cv_dict = render_request.cv_data.model_dump()
-        design_dict = render_request.design_settings.model_dump() if render_request.design_settings else None
-        file_bytes, filename = CVService.render_cv(
-            cv_data=cv_dict,
-            output_format=render_request.format,
-            theme=render_request.theme,
-            design_settings=design_dict,
-            section_order=render_request.section_order,
-        )
-        
-        if render_request.format == "pdf":
-            media_type = "application/pdf"
-        else:
-            media_type = "image/png"
-        
-        return Response(
-            content=file_bytes,
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"'
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _do_render(render_request, render_request.format)
 
 
 @router.post("/yaml")
@@ -232,9 +293,10 @@ async def generate_yaml(request: Request, render_request: RenderRequest) -> YAML
     Returns the YAML that would be used to render the CV.
     """
     try:
-        cv_dict = render_request.cv_data.model_dump()
-        design_dict = render_request.design_settings.model_dump() if render_request.design_settings else None
-        yaml_str = CVService.generate_yaml(
+        cv_dict = _cv_to_dict(render_request.cv_data)
+        design_dict = render_request.design_settings.__dict__ if render_request.design_settings else None
+        yaml_str = await asyncio.to_thread(
+            CVService.generate_yaml,
             cv_dict,
             render_request.theme,
             design_dict,
@@ -251,8 +313,7 @@ async def preview_cv(request: Request, render_request: RenderRequest) -> Respons
     """
     Generate PNG preview of CV (alias for render with format=png).
     """
-    render_request.format = "png"
-    return await render_cv(request, render_request)
+    return await _do_render(render_request, "png")
 
 
 @router.post("/download")
@@ -261,8 +322,7 @@ async def download_cv(request: Request, render_request: RenderRequest) -> Respon
     """
     Download CV as PDF (alias for render with format=pdf).
     """
-    render_request.format = "pdf"
-    return await render_cv(request, render_request)
+    return await _do_render(render_request, "pdf")
 
 
 @router.post("/cover-letter/generate")
@@ -272,8 +332,6 @@ async def generate_cover_letter(
     cover_letter_request: CoverLetterRequest,
 ) -> CoverLetterResponse:
     """Generate a tailored cover letter from CV data and a job description."""
-    from services.ai_service import AIService
-
     cv_dict = cover_letter_request.cv_data.model_dump()
     cover_letter = cover_letter_request.cover_letter
 
@@ -286,7 +344,7 @@ async def generate_cover_letter(
     source = "template"
     letter_text = ""
     if AIService.is_configured():
-        letter_text = AIService.generate_cover_letter(
+        letter_text = await AIService.generate_cover_letter(
             cv_data=cv_dict,
             target_role=cover_letter.target_role,
             company=cover_letter.company,
@@ -421,8 +479,6 @@ class AIStatusResponse(BaseModel):
 @limiter.limit("30/minute")
 async def ai_status(request: Request) -> AIStatusResponse:
     """Return AI provider and fallback capability metadata."""
-    from services.ai_service import AIService
-
     return AIStatusResponse(**AIService.status())
 
 
@@ -443,13 +499,11 @@ async def ai_suggest(request: Request, suggest_request: AISuggestRequest) -> AIS
     - generate: Generate a summary from scratch
     - honor: Format an honor/award entry
     """
-    from services.ai_service import AIService
-
     try:
         if not suggest_request.text and suggest_request.type not in {"generate", "skills"}:
             raise HTTPException(status_code=422, detail="Text is required for this AI suggestion type.")
 
-        result = AIService.suggest(suggest_request.type, suggest_request.text, suggest_request.context or "")
+        result = await AIService.suggest(suggest_request.type, suggest_request.text, suggest_request.context or "")
         if not result.text:
             logger.warning(f"AI service returned empty result for type: {suggest_request.type}")
             raise HTTPException(
@@ -484,14 +538,41 @@ async def ai_suggest(request: Request, suggest_request: AISuggestRequest) -> AIS
         )
 
 
+@router.post("/ai/suggest/stream")
+@limiter.limit("20/minute")
+async def ai_suggest_stream(request: Request, suggest_request: AISuggestRequest) -> StreamingResponse:
+    """
+    Stream an AI suggestion as server-sent events while it is generated.
+    
+    Each `data:` event carries a JSON object with the next `text` delta; a
+    final `done` event marks the end of the suggestion. Accepts the same
+    types as /ai/suggest.
+    """
+    if not suggest_request.text and suggest_request.type not in {"generate", "skills"}:
+        raise HTTPException(status_code=422, detail="Text is required for this AI suggestion type.")
+
+    async def events():
+        async for delta in AIService.stream_suggestion(
+            suggest_request.type,
+            suggest_request.text,
+            suggest_request.context or "",
+        ):
+            yield f"data: {json.dumps({'text': delta})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 @router.post("/ai/enhance-cv")
 @limiter.limit("10/minute")
 async def ai_enhance_cv(request: Request, enhance_request: AIEnhanceCVRequest) -> AIEnhanceCVResponse:
     """Enhance the current live CV for ATS strength and target-role fit."""
-    from services.ai_service import AIService
-
     try:
-        result = AIService.enhance_cv_for_ats(
+        result = await AIService.enhance_cv_for_ats(
             cv_data=enhance_request.cv_data.model_dump(),
             target_role=enhance_request.target_role,
             job_description=enhance_request.job_description,
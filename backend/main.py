@@ -12,6 +12,7 @@ import sys
 import logging
 import time
 import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 
@@ -41,14 +42,24 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from api.render import router as render_router
+from services.ai_service import close_client
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared outbound connections when the worker shuts down."""
+    yield
+    await close_client()
+
+
 app = FastAPI(
     title="RenderCV Web API",
     description="Generate professional CVs from structured data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add rate limiter to app state
@@ -78,9 +89,11 @@ logger.info(
     cors_origin_regex,
 )
 
+# CORSMiddleware checks exact origins with `in`; a frozenset makes that O(1).
+# Its simple/preflight response headers are already precomputed at startup.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=allowed_origins,
+    allow_origins=frozenset(allowed_origins),
     allow_origin_regex=cors_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
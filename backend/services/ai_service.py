@@ -5,14 +5,20 @@ deterministic local fallbacks available so the editor remains useful in local
 and offline deployments.
 """
 
+import asyncio
+import hashlib
 import json
+import logging
 import os
 import re
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from copy import deepcopy
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Literal
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 try:
     from dotenv import load_dotenv
@@ -21,6 +27,8 @@ try:
 except ImportError:
     pass
 
+logger = logging.getLogger(__name__)
+
 
 AITask = Literal[
     "summary",
@@ -53,16 +61,122 @@ OPENCODE_BASE_URL = os.getenv("OPENCODE_BASE_URL", "https://opencode.ai/zen/v1")
 OPENCODE_MODEL = os.getenv("OPENCODE_MODEL", "nemotron-3-super-free")
 OPENCODE_TIMEOUT = float(os.getenv("OPENCODE_TIMEOUT", "8.0"))
 
-client = (
-    OpenAI(
+
+@lru_cache(maxsize=1)
+def get_client() -> AsyncOpenAI | None:
+    """Create the provider client on first use; None when no key is configured."""
+    if not OPENCODE_API_KEY:
+        return None
+    return AsyncOpenAI(
         api_key=OPENCODE_API_KEY,
         base_url=OPENCODE_BASE_URL,
         timeout=OPENCODE_TIMEOUT,
         max_retries=0,
     )
-    if OPENCODE_API_KEY
-    else None
+
+
+async def close_client() -> None:
+    """Close the provider client's pooled connections if it was ever created."""
+    if not get_client.cache_info().currsize:
+        return
+    provider = get_client()
+    get_client.cache_clear()
+    if provider is not None:
+        await provider.close()
+
+
+# Task prompts are compiled once; build_prompt only fills in {text}/{context}.
+PROMPT_TEMPLATES: dict[AITask, str] = {
+    "summary": (
+        "Rewrite this CV summary in 2-3 confident sentences under 70 words. "
+        "Use ATS keywords naturally, avoid cliches, and keep only plain text.\n\n"
+        "Current summary: {text}\nTarget context: {context}"
+    ),
+    "headline": (
+        "Create a concise professional headline, 5-10 words, with specialty and value. "
+        "No quotes or labels.\n\n"
+        "Name or role: {text}\nContext: {context}"
+    ),
+    "bullet": (
+        "Rewrite this CV bullet as one achievement-led sentence under 24 words. "
+        "Start with a strong action verb and keep metrics only if supported by the source.\n\n"
+        "Current bullet: {text}\nRole or context: {context}"
+    ),
+    "education": (
+        "Improve this education highlight in 10-18 words. Keep honors, GPA, thesis, or coursework factual.\n\n"
+        "Highlight: {text}\nContext: {context}"
+    ),
+    "project_summary": (
+        "Rewrite this project summary in 18-28 words. Lead with value delivered, then technologies or scope.\n\n"
+        "Project summary: {text}\nProject context: {context}"
+    ),
+    "project_highlight": (
+        "Rewrite this project highlight as one technical achievement under 18 words. No bullet symbol.\n\n"
+        "Highlight: {text}\nProject context: {context}"
+    ),
+    "skills": (
+        "Suggest 5 relevant ATS-friendly skills. Return comma-separated skill names only.\n\n"
+        "Current skills: {text}\nTarget role or job context: {context}"
+    ),
+    "generate": (
+        "Write a 2-sentence professional summary under 65 words using the target role and available context. "
+        "Plain text only.\n\n"
+        "Name or profile: {text}\nTarget role: {context}"
+    ),
+    "honor": (
+        "Format this honor or award as one concise CV entry under 18 words. Plain text only.\n\n"
+        "Honor context: {text}\nAdditional context: {context}"
+    ),
+}
+
+# Output budgets sized from the validate_text word limits with headroom, so
+# short fields stop generating early without truncating valid answers.
+TASK_MAX_TOKENS: dict[AITask, int] = {
+    "summary": 180,
+    "headline": 40,
+    "bullet": 60,
+    "education": 50,
+    "project_summary": 70,
+    "project_highlight": 50,
+    "skills": 80,
+    "generate": 180,
+    "honor": 50,
+    "cover_letter": 750,
+}
+
+# Placeholder values used when the editor sends an empty field.
+PROMPT_DEFAULTS: dict[AITask, tuple[str, str]] = {
+    "summary": ("No summary provided", "General professional"),
+}
+
+SYSTEM_PROMPT = (
+    "You are an expert ATS resume and cover-letter writer. "
+    "Return only the requested final text. Do not include labels, markdown, "
+    "unsupported symbols, explanations, or invented metrics."
 )
+SYSTEM_MESSAGE: dict[str, str] = {"role": "system", "content": SYSTEM_PROMPT}
+
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "1024"))
+
+# Editors re-send identical prompts while typing and undoing; keep recent
+# accepted provider responses keyed by a digest of everything that shapes the
+# output. Callers store a reply only after it passes their validation.
+_response_cache: OrderedDict[bytes, str] = OrderedDict()
+_pending_responses: dict[bytes, asyncio.Future[str]] = {}
+
+
+def provider_cache_key(prompt: str, max_tokens: int, temperature: float) -> bytes:
+    """Return a compact cache key for a provider request."""
+    material = f"{OPENCODE_MODEL}\0{max_tokens}\0{temperature}\0{prompt}"
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).digest()
+
+
+def remember_response(key: bytes, text: str) -> None:
+    """Cache an accepted provider response, evicting the oldest entries."""
+    _response_cache[key] = text
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > AI_CACHE_SIZE:
+        _response_cache.popitem(last=False)
 
 
 @dataclass(frozen=True)
@@ -85,11 +199,20 @@ def clean_plain_text(value: str) -> str:
     text = re.sub(r"`([^`]*)`", r"\1", text)
     text = re.sub(r"[ \t]+\n", "\n", text)
     text = re.sub(r"\n{3,}", "\n\n", text)
-    if (text.startswith('"') and text.endswith('"')) or (text.startswith("'") and text.endswith("'")):
+    if len(text) > 1 and text[0] == text[-1] and text[0] in "\"'":
         text = text[1:-1].strip()
     return text
 
 
+HONOR_ENTRY_PATTERN = re.compile(r"^[A-Z][\w ]{4,}(?:,| \()")
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+def is_formatted_honor(text: str) -> bool:
+    """Return whether an honor already reads like "Award, Organization, Year"."""
+    return len(text) < 80 and bool(HONOR_ENTRY_PATTERN.match(text)) and bool(YEAR_PATTERN.search(text))
+
+
 def word_count(text: str) -> int:
     """Count plain words for response metadata and validation."""
     return len(re.findall(r"\b[\w'-]+\b", text))
@@ -268,7 +391,7 @@ class AIService:
     @staticmethod
     def is_configured() -> bool:
         """Return whether a provider key is available."""
-        return client is not None
+        return bool(OPENCODE_API_KEY)
 
     @staticmethod
     def status() -> dict:
@@ -283,28 +406,77 @@ class AIService:
         }
 
     @staticmethod
-    def suggest(task: AITask, text: str, context: str = "") -> AITextResult:
+    async def suggest(task: AITask, text: str, context: str = "") -> AITextResult:
         """Generate task-specific text with provider-first fallback behavior."""
         trimmed_text = text.strip()
         trimmed_context = context.strip()
 
+        if task == "honor" and is_formatted_honor(trimmed_text):
+            return AITextResult(text=trimmed_text, source="fallback", warnings=[])
+
         if AIService.is_configured():
             prompt = AIService.build_prompt(task, trimmed_text, trimmed_context)
-            generated = AIService.call_provider(
+            max_tokens = AIService.max_tokens_for_task(task)
+            temperature = AIService.temperature_for_task(task)
+            # Cover letters are regenerated on purpose, so never replay one.
+            use_cache = task != "cover_letter"
+            generated = await AIService.call_provider(
                 prompt=prompt,
-                max_tokens=AIService.max_tokens_for_task(task),
-                temperature=AIService.temperature_for_task(task),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                use_cache=use_cache,
             )
             cleaned = clean_plain_text(generated)
             warnings = AIService.validate_text(task, cleaned)
             if cleaned and not warnings:
+                if use_cache:
+                    remember_response(provider_cache_key(prompt, max_tokens, temperature), generated)
                 return AITextResult(text=cleaned, source="ai", warnings=[])
 
         fallback = AIService.fallback_suggestion(task, trimmed_text, trimmed_context)
         return AITextResult(text=fallback, source="fallback", warnings=["AI provider unavailable or returned unusable text."])
 
     @staticmethod
-    def enhance_cv_for_ats(
+    async def stream_suggestion(task: AITask, text: str, context: str = "") -> AsyncIterator[str]:
+        """Yield task-specific text as the provider generates it.
+
+        Streamed deltas reach the caller before the full text exists, so they
+        skip clean_plain_text/validate_text. Without a provider, or if the
+        provider fails before sending anything, the local fallback is yielded.
+        """
+        trimmed_text = text.strip()
+        trimmed_context = context.strip()
+
+        if task == "honor" and is_formatted_honor(trimmed_text):
+            yield trimmed_text
+            return
+
+        streamed_any = False
+        if AIService.is_configured():
+            try:
+                stream = await get_client().chat.completions.create(
+                    messages=[
+                        SYSTEM_MESSAGE,
+                        {"role": "user", "content": AIService.build_prompt(task, trimmed_text, trimmed_context)},
+                    ],
+                    model=OPENCODE_MODEL,
+                    temperature=AIService.temperature_for_task(task),
+                    max_tokens=AIService.max_tokens_for_task(task),
+                    stream=True,
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        streamed_any = True
+                        yield delta
+            except Exception:
+                logger.exception("OpenAI-compatible provider stream error")
+
+        if not streamed_any:
+            yield AIService.fallback_suggestion(task, trimmed_text, trimmed_context)
+
+    @staticmethod
+    async def enhance_cv_for_ats(
         cv_data: dict[str, Any],
         target_role: str = "",
         job_description: str = "",
@@ -314,10 +486,11 @@ class AIService:
         role = infer_target_role(cv_data, target_role)
         if AIService.is_configured():
             prompt = AIService.build_ats_enhancement_prompt(cv_data, role, job_description, current_score)
-            generated = AIService.call_provider(
+            generated = await AIService.call_provider(
                 prompt=prompt,
                 max_tokens=1200,
                 temperature=0.35,
+                use_cache=False,
             )
             parsed = parse_json_object(generated)
             if parsed and isinstance(parsed.get("cv_data"), dict):
@@ -434,50 +607,12 @@ Return one JSON object only with this exact shape:
     @staticmethod
     def build_prompt(task: AITask, text: str, context: str = "") -> str:
         """Build a constrained prompt for a specific editor task."""
-        prompts: dict[AITask, str] = {
-            "summary": (
-                "Rewrite this CV summary in 2-3 confident sentences under 70 words. "
-                "Use ATS keywords naturally, avoid cliches, and keep only plain text.\n\n"
-                f"Current summary: {text or 'No summary provided'}\nTarget context: {context or 'General professional'}"
-            ),
-            "headline": (
-                "Create a concise professional headline, 5-10 words, with specialty and value. "
-                "No quotes or labels.\n\n"
-                f"Name or role: {text}\nContext: {context}"
-            ),
-            "bullet": (
-                "Rewrite this CV bullet as one achievement-led sentence under 24 words. "
-                "Start with a strong action verb and keep metrics only if supported by the source.\n\n"
-                f"Current bullet: {text}\nRole or context: {context}"
-            ),
-            "education": (
-                "Improve this education highlight in 10-18 words. Keep honors, GPA, thesis, or coursework factual.\n\n"
-                f"Highlight: {text}\nContext: {context}"
-            ),
-            "project_summary": (
-                "Rewrite this project summary in 18-28 words. Lead with value delivered, then technologies or scope.\n\n"
-                f"Project summary: {text}\nProject context: {context}"
-            ),
-            "project_highlight": (
-                "Rewrite this project highlight as one technical achievement under 18 words. No bullet symbol.\n\n"
-                f"Highlight: {text}\nProject context: {context}"
-            ),
-            "skills": (
-                "Suggest 5 relevant ATS-friendly skills. Return comma-separated skill names only.\n\n"
-                f"Current skills: {text}\nTarget role or job context: {context}"
-            ),
-            "generate": (
-                "Write a 2-sentence professional summary under 65 words using the target role and available context. "
-                "Plain text only.\n\n"
-                f"Name or profile: {text}\nTarget role: {context}"
-            ),
-            "honor": (
-                "Format this honor or award as one concise CV entry under 18 words. Plain text only.\n\n"
-                f"Honor context: {text}\nAdditional context: {context}"
-            ),
-            "cover_letter": text,
-        }
-        return prompts[task]
+        if task == "cover_letter":
+            return text
+        default_text, default_context = PROMPT_DEFAULTS.get(task, ("", ""))
+        return PROMPT_TEMPLATES[task].format_map(
+            {"text": text or default_text, "context": context or default_context}
+        )
 
     @staticmethod
     def fallback_suggestion(task: AITask, text: str, context: str = "") -> str:
@@ -550,7 +685,7 @@ Return one JSON object only with this exact shape:
     @staticmethod
     def max_tokens_for_task(task: AITask) -> int:
         """Return task-specific max token budgets."""
-        return 750 if task == "cover_letter" else 260
+        return TASK_MAX_TOKENS[task]
 
     @staticmethod
     def temperature_for_task(task: AITask) -> float:
@@ -558,76 +693,103 @@ Return one JSON object only with this exact shape:
         return 0.45 if task in {"bullet", "skills", "honor"} else 0.6
 
     @staticmethod
-    def call_provider(prompt: str, max_tokens: int = 300, temperature: float = 0.6) -> str:
-        """Call the OpenAI-compatible provider and return plain text."""
-        if client is None:
+    async def call_provider(
+        prompt: str,
+        max_tokens: int = 300,
+        temperature: float = 0.6,
+        use_cache: bool = True,
+    ) -> str:
+        """Call the OpenAI-compatible provider and return plain text.
+
+        With use_cache, a response previously accepted via remember_response is
+        returned without a provider call. Concurrent identical requests always
+        share a single provider call.
+        """
+        if get_client() is None:
             return ""
+        key = provider_cache_key(prompt, max_tokens, temperature)
+        if use_cache:
+            cached = _response_cache.get(key)
+            if cached is not None:
+                _response_cache.move_to_end(key)
+                return cached
+
+        pending = _pending_responses.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                AIService.request_completion(prompt, max_tokens, temperature)
+            )
+            _pending_responses[key] = pending
+            pending.add_done_callback(lambda _: _pending_responses.pop(key, None))
+
+        return await asyncio.shield(pending)
+
+    @staticmethod
+    async def request_completion(prompt: str, max_tokens: int, temperature: float) -> str:
+        """Send one chat completion request to the provider."""
         try:
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an expert ATS resume and cover-letter writer. "
-                            "Return only the requested final text. Do not include labels, markdown, "
-                            "unsupported symbols, explanations, or invented metrics."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
+            chat_completion = await get_client().chat.completions.create(
+                messages=[SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
                 model=OPENCODE_MODEL,
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
             return chat_completion.choices[0].message.content or ""
-        except Exception as error:
-            print(f"OpenAI-compatible provider error: {error}")
+        except Exception:
+            logger.exception("OpenAI-compatible provider error")
             return ""
 
     @staticmethod
-    def improve_summary(current_summary: str, job_title: str = "") -> str:
+    async def improve_summary(current_summary: str, job_title: str = "") -> str:
         """Improve a professional summary."""
-        return AIService.suggest("summary", current_summary, job_title).text
+        result = await AIService.suggest("summary", current_summary, job_title)
+        return result.text
 
     @staticmethod
-    def generate_headline(name: str, role: str = "", experience: str = "") -> str:
+    async def generate_headline(name: str, role: str = "", experience: str = "") -> str:
         """Generate a concise professional headline."""
         context = " ".join(value for value in [role, experience] if value)
-        return AIService.suggest("headline", name, context).text
+        result = await AIService.suggest("headline", name, context)
+        return result.text
 
     @staticmethod
-    def improve_experience_bullet(bullet: str, role: str = "", company: str = "") -> str:
+    async def improve_experience_bullet(bullet: str, role: str = "", company: str = "") -> str:
         """Improve an experience bullet point."""
         context = " ".join(value for value in [role, company] if value)
-        return AIService.suggest("bullet", bullet, context).text
+        result = await AIService.suggest("bullet", bullet, context)
+        return result.text
 
     @staticmethod
-    def improve_education_highlight(highlight: str, degree: str = "", field: str = "") -> str:
+    async def improve_education_highlight(highlight: str, degree: str = "", field: str = "") -> str:
         """Improve an education highlight."""
         context = " ".join(value for value in [degree, field] if value)
-        return AIService.suggest("education", highlight, context).text
+        result = await AIService.suggest("education", highlight, context)
+        return result.text
 
     @staticmethod
-    def improve_project_summary(summary: str, project_name: str = "") -> str:
+    async def improve_project_summary(summary: str, project_name: str = "") -> str:
         """Improve a project summary."""
-        return AIService.suggest("project_summary", summary, project_name).text
+        result = await AIService.suggest("project_summary", summary, project_name)
+        return result.text
 
     @staticmethod
-    def improve_project_highlight(highlight: str, project_name: str = "") -> str:
+    async def improve_project_highlight(highlight: str, project_name: str = "") -> str:
         """Improve a project bullet point."""
-        return AIService.suggest("project_highlight", highlight, project_name).text
+        result = await AIService.suggest("project_highlight", highlight, project_name)
+        return result.text
 
     @staticmethod
-    def suggest_skills(job_title: str, current_skills: list[str]) -> list[str]:
+    async def suggest_skills(job_title: str, current_skills: list[str]) -> list[str]:
         """Suggest skills for a target role."""
-        result = AIService.suggest("skills", ", ".join(current_skills), job_title).text
-        return [skill.strip() for skill in result.split(",") if skill.strip()][:5]
+        result = await AIService.suggest("skills", ", ".join(current_skills), job_title)
+        return [skill.strip() for skill in result.text.split(",") if skill.strip()][:5]
 
     @staticmethod
-    def generate_summary(name: str, job_title: str, years_exp: int = 0) -> str:
+    async def generate_summary(name: str, job_title: str, years_exp: int = 0) -> str:
         """Generate a professional summary from scratch."""
         context = f"{job_title} {years_exp} years".strip()
-        return AIService.suggest("generate", name, context).text
+        result = await AIService.suggest("generate", name, context)
+        return result.text
 
     @staticmethod
     def improve_publication_title(title: str, field: str = "") -> str:
@@ -635,12 +797,13 @@ Return one JSON object only with this exact shape:
         return title
 
     @staticmethod
-    def generate_honor_entry(context: str) -> str:
+    async def generate_honor_entry(context: str) -> str:
         """Format an honor or award entry."""
-        return AIService.suggest("honor", context).text
+        result = await AIService.suggest("honor", context)
+        return result.text
 
     @staticmethod
-    def generate_cover_letter(
+    async def generate_cover_letter(
         cv_data: dict,
         target_role: str,
         company: str,
@@ -673,5 +836,5 @@ Requirements:
 - Prioritize the candidate's edited skills, projects, and recent experience.
 - Mention 1-2 concrete achievements or projects from the CV when available.
 """
-        result = AIService.suggest("cover_letter", prompt)
+        result = await AIService.suggest("cover_letter", prompt)
         return result.text if result.source == "ai" else ""
@@ -2,25 +2,76 @@
 CV Rendering Service.
 
 Wraps RenderCV core functionality for web API use.
-Uses the rendercv CLI for rendering since the PyPI package is CLI-based.
+Renders in-process: the CV dict is validated straight into a RenderCV model,
+so no YAML file or CLI subprocess sits on the render path.
 """
 
+import atexit
+import functools
+import hashlib
+import json
+import os
+import queue
 import tempfile
 import shutil
-import subprocess
-import sys
+import threading
 import re
-import os
+from collections import OrderedDict
+from datetime import date
 from pathlib import Path
 import yaml
 import pydantic
 import pydantic_extra_types.phone_numbers as pydantic_phone_numbers
+import rendercv_fonts
+import typst
+from rendercv.exception import RenderCVUserValidationError
+from rendercv.renderer.pdf_png import get_package_path
+from rendercv.renderer.templater.templater import render_full_template
 from rendercv.schema.models.design.built_in_design import available_themes
+from rendercv.schema.rendercv_model_builder import build_rendercv_model_from_commented_map
+
+try:
+    # libyaml's C emitter; fall back to the pure-Python one when unavailable.
+    from yaml import CSafeDumper as _YAMLDumper
+except ImportError:
+    from yaml import SafeDumper as _YAMLDumper
 
 _PHONE_VALIDATOR = pydantic.TypeAdapter[pydantic_phone_numbers.PhoneNumber](
     pydantic_phone_numbers.PhoneNumber
 )
 
+_URL_SCHEMES = ("http://", "https://")
+
+# UTF-8 encoded Typst source keyed by a hash of the render input, so re-rendering
+# the same CV (e.g. PNG preview then PDF download) skips validation and templating.
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "64"))
+_render_cache: OrderedDict[bytes, bytes] = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+# Built structures keyed by a hash of the editor payload, so the /yaml export and
+# the preview renders that follow each edit only normalize it once.
+STRUCTURE_CACHE_SIZE = 128
+_structure_cache: OrderedDict[bytes, dict] = OrderedDict()
+_structure_cache_lock = threading.Lock()
+
+# One warm Typst compiler per render thread. RenderCV's own helper caches a
+# single compiler keyed on the job directory, so it was rebuilt on every render.
+_typst_compilers = threading.local()
+
+
+@functools.lru_cache(maxsize=1)
+def _render_root() -> Path:
+    """Shared parent of all render job directories, used as the Typst root."""
+    root = Path(tempfile.mkdtemp(prefix="rendercv_"))
+    atexit.register(shutil.rmtree, root, True)
+    return root
+
+
+# Emptied job directories waiting to be reused, capped so idle workers don't
+# keep an unbounded number around.
+SCRATCH_POOL_SIZE = min(os.cpu_count() or 2, 16)
+_scratch_dirs: queue.LifoQueue[Path] = queue.LifoQueue(maxsize=SCRATCH_POOL_SIZE)
+
 
 class CVService:
     """Service for rendering CVs from structured data."""
@@ -153,7 +204,24 @@ class CVService:
             "recommendedFor": ["experienced", "work history", "recruiter", "operations", "career pivot"],
         },
     }
-    AVAILABLE_THEMES = available_themes
+    # Editor section ids (and RenderCV keys, for older payloads) -> RenderCV section keys
+    SECTION_KEY_MAP = {
+        "summary": "Summary",
+        "experience": "experience",
+        "education": "education",
+        "skills": "skills",
+        "projects": "projects",
+        "publications": "publications",
+        "honors": "selected_honors",
+        "selected_honors": "selected_honors",
+        "patents": "patents",
+        "talks": "invited_talks",
+        "invited_talks": "invited_talks",
+    }
+    # RenderCV design colors that follow the editor's single primary color
+    DESIGN_COLOR_KEYS = ("name", "headline", "connections", "section_titles", "links")
+    AVAILABLE_THEMES: tuple[str, ...] = tuple(available_themes)
+    THEME_IDS: tuple[str, ...] = (*THEME_ALIASES, *AVAILABLE_THEMES)
 
     @classmethod
     def resolve_theme(cls, theme: str) -> str:
@@ -161,14 +229,13 @@ class CVService:
         return cls.THEME_ALIASES.get(theme, theme)
     
     @classmethod
-    def get_themes(cls) -> list[str]:
-        """Return list of available themes."""
-        return [*cls.THEME_ALIASES.keys(), *cls.AVAILABLE_THEMES]
+    def get_themes(cls) -> tuple[str, ...]:
+        """Return the available theme ids."""
+        return cls.THEME_IDS
 
     @classmethod
     def get_theme_metadata(cls) -> list[dict]:
         """Return metadata for all available built-in themes."""
-        theme_ids = [*cls.THEME_ALIASES.keys(), *cls.AVAILABLE_THEMES]
         return [
             {
                 "id": theme_id,
@@ -183,20 +250,53 @@ class CVService:
                     },
                 ),
             }
-            for theme_id in theme_ids
+            for theme_id in cls.THEME_IDS
         ]
     
+    @staticmethod
+    def acquire_render_dir() -> Path:
+        """Return an empty job directory, reusing a pooled one when available."""
+        try:
+            return _scratch_dirs.get_nowait()
+        except queue.Empty:
+            return Path(tempfile.mkdtemp(prefix="job_", dir=_render_root()))
+
+    @staticmethod
+    def recycle_render_dir(temp_dir: Path) -> None:
+        """Empty a job directory back into the pool, or remove it if it can't be reused."""
+        if temp_dir.parent == _render_root():
+            try:
+                for child in temp_dir.iterdir():
+                    if child.is_dir():
+                        shutil.rmtree(child)
+                    else:
+                        child.unlink()
+                _scratch_dirs.put_nowait(temp_dir)
+                return
+            except (OSError, queue.Full):
+                pass
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
     @classmethod
-    def render_cv(
+    def discard_render_dir(cls, temp_dir: Path) -> None:
+        """Recycle a render directory in the background so callers don't wait on it."""
+        threading.Thread(
+            target=cls.recycle_render_dir,
+            args=(temp_dir,),
+            daemon=True,
+        ).start()
+
+    @classmethod
+    def render_cv_file(
         cls,
         cv_data: dict,
         output_format: str = "png",
         theme: str = "classic",
         design_settings: dict = None,
         section_order: list = None,
-    ) -> tuple[bytes, str]:
+    ) -> tuple[Path, str, Path]:
         """
-        Render CV from structured data.
+        Render CV to a file on disk so it can be streamed to the client.
         
         Args:
             cv_data: Dictionary containing CV data (name, sections, etc.)
@@ -205,78 +305,95 @@ class CVService:
             design_settings: Optional design customization (colors, fonts)
             
         Returns:
-            Tuple of (file_bytes, filename)
+            Tuple of (file_path, filename, temp_dir). The file is meant to be
+            streamed (e.g. with FileResponse) rather than read into memory; the
+            caller owns temp_dir and must hand it to recycle_render_dir once the
+            file has been sent.
         """
-        # Create temporary directory for rendering
-        temp_dir = Path(tempfile.mkdtemp(prefix="rendercv_"))
+        temp_dir = cls.acquire_render_dir()
         
         try:
-            # Build full YAML structure
-            full_data = cls._build_yaml_structure(
+            full_data = cls.build_structure(
                 cv_data,
                 theme,
                 design_settings,
                 section_order,
             )
             
-            # Write YAML file - sort_keys=False is CRITICAL to preserve section order!
-            yaml_path = temp_dir / "cv.yaml"
-            with open(yaml_path, "w", encoding="utf-8") as f:
-                yaml.dump(full_data, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
-            
-            # Use rendercv CLI via python -m to render
-            output_dir = temp_dir / "output"
-            render_env = {
-                **os.environ,
-                "PYTHONIOENCODING": "utf-8",
-            }
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    "-m",
-                    "rendercv",
-                    "render",
-                    str(yaml_path),
-                    "--output-folder",
-                    str(output_dir),
-                    "--quiet",
-                ],
-                capture_output=True,
-                text=True,
-                env=render_env,
-                timeout=120
-            )
-            
-            if result.returncode != 0:
-                # Read the generated YAML for debugging
-                yaml_content = yaml_path.read_text()[:500] if yaml_path.exists() else "YAML file not found"
-                raise ValueError(f"RenderCV failed (code {result.returncode}): stdout={result.stdout[:2000]}, stderr={result.stderr[:500]}, yaml={yaml_content}")
-            
+            typst_source = cls._typst_source(full_data)
             name = cv_data.get('name', 'CV').replace(' ', '_')
+
+            # Only compile the format that was asked for
+            file_path = cls._compile_typst(
+                typst_source, temp_dir / f"cv.{output_format}", output_format
+            )
+            return file_path, f"{name}_CV.{output_format}", temp_dir
             
-            # RenderCV creates output in a subdirectory - check multiple locations
-            search_dirs = [output_dir, temp_dir]
-            
-            # Find generated files
-            if output_format == "pdf":
-                for search_dir in search_dirs:
-                    pdf_files = list(search_dir.glob("**/*.pdf"))
-                    if pdf_files:
-                        return pdf_files[0].read_bytes(), f"{name}_CV.pdf"
-            else:
-                for search_dir in search_dirs:
-                    png_files = sorted(search_dir.glob("**/*.png"))
-                    if png_files:
-                        return png_files[0].read_bytes(), f"{name}_CV.png"
-            
-            # Debug: list all files in temp_dir for troubleshooting
-            all_files = list(temp_dir.glob("**/*"))
-            file_list = [str(f.relative_to(temp_dir)) for f in all_files if f.is_file()]
-            raise ValueError(f"Failed to generate output. Files found: {file_list}, stdout: {result.stdout[:500]}")
-            
-        finally:
-            # Cleanup temp directory
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        except Exception:
+            # Cleanup temp directory; on success the caller removes it
+            cls.discard_render_dir(temp_dir)
+            raise
+
+    @staticmethod
+    def _typst_compiler() -> typst.Compiler:
+        """Return this thread's Typst compiler, creating it on first use."""
+        compiler = getattr(_typst_compilers, "compiler", None)
+        if compiler is None:
+            compiler = typst.Compiler(
+                root=_render_root(),
+                font_paths=rendercv_fonts.paths_to_font_folders,
+                package_path=get_package_path(),
+            )
+            _typst_compilers.compiler = compiler
+        return compiler
+
+    @classmethod
+    def _compile_typst(cls, typst_source: bytes, output_path: Path, output_format: str) -> Path:
+        """Compile in-memory Typst source to a PDF, or to a PNG of the first page."""
+        compiler = cls._typst_compiler()
+        if output_format == "pdf":
+            compiler.compile(input=typst_source, format="pdf", output=output_path)
+        else:
+            pages = compiler.compile(input=typst_source, format="png")
+            output_path.write_bytes(pages[0] if isinstance(pages, list) else pages)
+        return output_path
+
+    @staticmethod
+    def _render_cache_key(full_data: dict) -> bytes:
+        """Hash the render input; key order is kept because it drives section order."""
+        payload = json.dumps(
+            [date.today().isoformat(), full_data],
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+    @classmethod
+    def _typst_source(cls, full_data: dict) -> bytes:
+        """Return the encoded Typst source for full_data, from the cache when possible."""
+        key = cls._render_cache_key(full_data)
+        with _render_cache_lock:
+            typst_source = _render_cache.get(key)
+            if typst_source is not None:
+                _render_cache.move_to_end(key)
+                return typst_source
+
+        # Validate the dict directly; there is no YAML to emit or re-parse.
+        try:
+            rendercv_model = build_rendercv_model_from_commented_map(full_data)
+        except RenderCVUserValidationError as e:
+            details = "; ".join(
+                f"{'.'.join(map(str, error.schema_location or ()))}: {error.message}"
+                for error in e.validation_errors
+            )
+            raise ValueError(f"Invalid CV data: {details}") from e
+        typst_source = render_full_template(rendercv_model, "typst").encode("utf-8")
+
+        with _render_cache_lock:
+            _render_cache[key] = typst_source
+            while len(_render_cache) > RENDER_CACHE_SIZE:
+                _render_cache.popitem(last=False)
+        return typst_source
 
     @classmethod
     def generate_yaml(
@@ -287,39 +404,79 @@ class CVService:
         section_order: list[str] | None = None,
     ) -> str:
         """Generate the RenderCV YAML string for a CV payload."""
-        full_data = cls._build_yaml_structure(
-            cv_data=cv_data,
-            theme=theme,
-            design_settings=design_settings,
-            section_order=section_order,
+        return cls.to_yaml(
+            cls.build_structure(
+                cv_data=cv_data,
+                theme=theme,
+                design_settings=design_settings,
+                section_order=section_order,
+            )
         )
+
+    @staticmethod
+    def to_yaml(full_data: dict) -> str:
+        """Serialize a structure from build_structure; key order is section order."""
         return yaml.dump(
             full_data,
+            Dumper=_YAMLDumper,
             allow_unicode=True,
             default_flow_style=False,
             sort_keys=False,
         )
     
     @classmethod
-    def _build_yaml_structure(
+    def build_structure(
         cls,
         cv_data: dict,
         theme: str,
         design_settings: dict = None,
         section_order: list = None,
     ) -> dict:
-        """Build complete YAML structure from simplified CV data."""
+        """Build the RenderCV input structure from simplified CV data.
+
+        Rendering consumes this dict directly; only YAML exports serialize it.
+        Results are cached per input and shared, so callers must not mutate them.
+        """
+        # Input key order is irrelevant to the output, so sort it for a stable key
+        payload = json.dumps(
+            [cv_data, theme, design_settings or {}, section_order or []],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        key = hashlib.blake2b(payload.encode(), digest_size=16).digest()
+        with _structure_cache_lock:
+            full_data = _structure_cache.get(key)
+            if full_data is not None:
+                _structure_cache.move_to_end(key)
+                return full_data
+
+        full_data = cls._build_structure(cv_data, theme, design_settings, section_order)
+        with _structure_cache_lock:
+            _structure_cache[key] = full_data
+            while len(_structure_cache) > STRUCTURE_CACHE_SIZE:
+                _structure_cache.popitem(last=False)
+        return full_data
+
+    @classmethod
+    def _build_structure(
+        cls,
+        cv_data: dict,
+        theme: str,
+        design_settings: dict | None,
+        section_order: list | None,
+    ) -> dict:
         
         def normalize_url(url: str) -> str:
             """Normalize and validate URL. Returns empty string if invalid."""
-            if not url or not url.strip():
+            url = (url or "").strip()
+            if not url:
                 return ""
-            url = url.strip()
             # Skip obviously invalid URLs
             if ',' in url or ' ' in url:
                 return ""
             # Add https:// if no protocol
-            if not url.startswith(('http://', 'https://')):
+            if not url.startswith(_URL_SCHEMES):
                 url = 'https://' + url
             # Basic validation - must have at least one dot and no spaces
             if '.' not in url:
@@ -344,7 +501,9 @@ class CVService:
 
         def clean_string(value: object) -> str:
             """Return a trimmed string for optional text fields."""
-            return str(value or "").strip()
+            if isinstance(value, str):
+                return value.strip()
+            return str(value).strip() if value else ""
 
         def normalize_phone(value: object, location_value: str = "") -> str:
             """Return a RenderCV-valid phone number or omit it.
@@ -398,15 +557,13 @@ class CVService:
 
         def split_lines(value: object) -> list[str]:
             """Convert textarea-style content to RenderCV highlights."""
-            if isinstance(value, list):
-                return [clean_string(item) for item in value if clean_string(item)]
-            return [line.strip() for line in str(value or "").splitlines() if line.strip()]
+            items = value if isinstance(value, list) else str(value or "").splitlines()
+            return [item for item in map(clean_string, items) if item]
 
         def split_authors(value: object) -> list[str]:
             """Normalize publication authors from comma-separated text or a list."""
-            if isinstance(value, list):
-                return [clean_string(author) for author in value if clean_string(author)]
-            return [author.strip() for author in str(value or "").split(",") if author.strip()]
+            authors = value if isinstance(value, list) else str(value or "").split(",")
+            return [author for author in map(clean_string, authors) if author]
 
         def normalize_date(value: object, allow_present: bool = False) -> str:
             """Normalize common editor date input to RenderCV's accepted date forms."""
@@ -441,14 +598,14 @@ class CVService:
             return ""
         
         # Extract personal info (ensure all are strings)
-        name = str(cv_data.get("name", "") or "").strip()
-        headline = str(cv_data.get("headline", "") or "")
-        email = str(cv_data.get("email", "") or "")
-        location = str(cv_data.get("location", "") or "")
-        phone = normalize_phone(cv_data.get("phone", ""), location)
-        website = normalize_url(str(cv_data.get("website", "") or ""))
-        linkedin = str(cv_data.get("linkedin", "") or "")
-        github = str(cv_data.get("github", "") or "")
+        name = clean_string(cv_data.get("name"))
+        headline = clean_string(cv_data.get("headline"))
+        email = clean_string(cv_data.get("email"))
+        location = clean_string(cv_data.get("location"))
+        phone = normalize_phone(cv_data.get("phone"), location)
+        website = normalize_url(clean_string(cv_data.get("website")))
+        linkedin = clean_string(cv_data.get("linkedin"))
+        github = clean_string(cv_data.get("github"))
         
         # Build social networks
         social_networks = []
@@ -457,24 +614,6 @@ class CVService:
         if github:
             social_networks.append({"network": "GitHub", "username": github})
         
-        # Build CV section - use rendercv v2.x field names
-        cv_section = {
-            "name": name or "Your Name",
-        }
-        
-        if headline:
-            cv_section["headline"] = headline
-        if email:
-            cv_section["email"] = email
-        if phone:
-            cv_section["phone"] = phone
-        if location:
-            cv_section["location"] = location
-        if website:
-            cv_section["website"] = website
-        if social_networks:
-            cv_section["social_networks"] = social_networks
-        
         # Build sections in a staging map first. Ordering is applied after all
         # renderable sections have been normalized.
         available_sections = {}
@@ -484,178 +623,116 @@ class CVService:
         if summary:
             available_sections["Summary"] = [summary]
         
-        # Experience section
-        experience = cv_data.get("experience", [])
-        if experience:
-            exp_entries = []
-            for exp in experience:
-                if not clean_string(exp.get("company")) or not clean_string(exp.get("position")):
-                    continue
-                entry = {
-                    "company": exp.get("company", ""),
-                    "position": exp.get("position", ""),
-                    "date": normalize_date(exp.get("date")),
-                    "start_date": normalize_date(exp.get("start_date")),
-                    "end_date": normalize_date(exp.get("end_date"), allow_present=True),
-                    "location": exp.get("location", ""),
-                    "summary": exp.get("summary", ""),
-                    "highlights": split_lines(exp.get("highlights")),
-                }
-                exp_entries.append(compact_entry(entry))
-            
-            if exp_entries:
-                available_sections["experience"] = exp_entries
-        
-        # Education section
-        education = cv_data.get("education", [])
-        if education:
-            edu_entries = []
-            for edu in education:
-                if not clean_string(edu.get("institution")) or not clean_string(edu.get("area")):
-                    continue
-                entry = {
-                    "institution": edu.get("institution", ""),
-                    "area": edu.get("area", ""),
-                    "degree": edu.get("degree", ""),
-                    "date": normalize_date(edu.get("date")),
-                    "start_date": normalize_date(edu.get("start_date")),
-                    "end_date": normalize_date(edu.get("end_date"), allow_present=True),
-                    "location": edu.get("location", ""),
-                    "summary": edu.get("summary", ""),
-                    "highlights": split_lines(edu.get("highlights")),
-                }
-                edu_entries.append(compact_entry(entry))
-            
-            if edu_entries:
-                available_sections["education"] = edu_entries
-        
-        # Skills section
-        skills = cv_data.get("skills", [])
-        if skills:
-            skill_entries = []
-            for skill in skills:
-                if skill.get("label") and skill.get("details"):
-                    skill_entries.append(compact_entry({
-                        "label": skill.get("label"),
-                        "details": skill.get("details"),
-                    }))
-            if skill_entries:
-                available_sections["skills"] = skill_entries
-        
-        # Projects section
-        projects = cv_data.get("projects", [])
-        if projects:
-            proj_entries = []
-            for proj in projects:
-                if not clean_string(proj.get("name")):
-                    continue
-                entry = {
-                    "name": proj.get("name", ""),
-                    "date": normalize_date(proj.get("date")),
-                    "start_date": normalize_date(proj.get("start_date")),
-                    "end_date": normalize_date(proj.get("end_date"), allow_present=True),
-                    "location": proj.get("location", ""),
-                    "summary": proj.get("summary", ""),
-                    "highlights": split_lines(proj.get("highlights")),
-                }
-                
-                if proj.get("url"):
-                    normalized_url = normalize_url(proj.get("url", ""))
-                    if normalized_url:
-                        entry["highlights"] = with_project_link(
-                            entry["highlights"],
-                            normalized_url,
-                        )
-                        entry["url"] = normalized_url
-                
-                proj_entries.append(compact_entry(entry))
-            
-            if proj_entries:
-                available_sections["projects"] = proj_entries
-        
-        # Publications section
-        publications = cv_data.get("publications", [])
-        if publications:
-            pub_entries = []
-            for pub in publications:
-                if not clean_string(pub.get("title")) or not split_authors(pub.get("authors")):
-                    continue
-                entry = {
-                    "title": pub.get("title", ""),
-                    "authors": split_authors(pub.get("authors")),
-                    "journal": pub.get("journal", ""),
-                    "date": normalize_date(pub.get("date")),
-                    "doi": pub.get("doi", ""),
-                    "summary": pub.get("summary", ""),
-                }
-                if pub.get("url"):
-                    normalized_url = normalize_url(pub.get("url", ""))
-                    if normalized_url:
-                        entry["url"] = normalized_url
-                
-                pub_entries.append(compact_entry(entry))
-            
-            if pub_entries:
-                available_sections["publications"] = pub_entries
-
-        honors = cv_data.get("honors", [])
-        if honors:
-            honor_entries = [
-                compact_entry({"bullet": honor.get("bullet", "")})
-                for honor in honors
-                if clean_string(honor.get("bullet"))
-            ]
-            if honor_entries:
-                available_sections["selected_honors"] = honor_entries
-
-        patents = cv_data.get("patents", [])
-        if patents:
-            patent_entries = [
-                compact_entry({"number": patent.get("number", "")})
-                for patent in patents
-                if clean_string(patent.get("number"))
-            ]
-            if patent_entries:
-                available_sections["patents"] = patent_entries
-
-        talks = cv_data.get("talks", [])
-        if talks:
-            talk_entries = [
-                compact_entry({"reversed_number": talk.get("reversed_number", "")})
-                for talk in talks
-                if clean_string(talk.get("reversed_number"))
+        # Per-entry builders return None for drafts that are missing required fields.
+        def build_experience(exp: dict) -> dict | None:
+            company = clean_string(exp.get("company"))
+            position = clean_string(exp.get("position"))
+            if not company or not position:
+                return None
+            return compact_entry({
+                "company": company,
+                "position": position,
+                "date": normalize_date(exp.get("date")),
+                "start_date": normalize_date(exp.get("start_date")),
+                "end_date": normalize_date(exp.get("end_date", "present"), allow_present=True),
+                "location": exp.get("location", ""),
+                "summary": exp.get("summary", ""),
+                "highlights": split_lines(exp.get("highlights")),
+            })
+
+        def build_education(edu: dict) -> dict | None:
+            institution = clean_string(edu.get("institution"))
+            area = clean_string(edu.get("area"))
+            if not institution or not area:
+                return None
+            return compact_entry({
+                "institution": institution,
+                "area": area,
+                "degree": edu.get("degree", ""),
+                "date": normalize_date(edu.get("date")),
+                "start_date": normalize_date(edu.get("start_date")),
+                "end_date": normalize_date(edu.get("end_date"), allow_present=True),
+                "location": edu.get("location", ""),
+                "summary": edu.get("summary", ""),
+                "highlights": split_lines(edu.get("highlights")),
+            })
+
+        def build_skill(skill: dict) -> dict | None:
+            label = clean_string(skill.get("label"))
+            details = clean_string(skill.get("details"))
+            if not label or not details:
+                return None
+            return {"label": label, "details": details}
+
+        def build_project(proj: dict) -> dict | None:
+            project_name = clean_string(proj.get("name"))
+            if not project_name:
+                return None
+            entry = {
+                "name": project_name,
+                "date": normalize_date(proj.get("date")),
+                "start_date": normalize_date(proj.get("start_date")),
+                "end_date": normalize_date(proj.get("end_date"), allow_present=True),
+                "location": proj.get("location", ""),
+                "summary": proj.get("summary", ""),
+                "highlights": split_lines(proj.get("highlights")),
+            }
+            normalized_url = normalize_url(proj.get("url", ""))
+            if normalized_url:
+                entry["highlights"] = with_project_link(entry["highlights"], normalized_url)
+                entry["url"] = normalized_url
+            return compact_entry(entry)
+
+        def build_publication(pub: dict) -> dict | None:
+            title = clean_string(pub.get("title"))
+            authors = split_authors(pub.get("authors"))
+            if not title or not authors:
+                return None
+            entry = {
+                "title": title,
+                "authors": authors,
+                "journal": pub.get("journal", ""),
+                "date": normalize_date(pub.get("date")),
+                "doi": pub.get("doi", ""),
+                "summary": pub.get("summary", ""),
+            }
+            normalized_url = normalize_url(pub.get("url", ""))
+            if normalized_url:
+                entry["url"] = normalized_url
+            return compact_entry(entry)
+
+        def build_single_field(field: str):
+            def build(entry: dict) -> dict | None:
+                value = clean_string(entry.get(field))
+                return {field: value} if value else None
+            return build
+
+        # (RenderCV section key, cv_data key, entry builder), in fallback order
+        section_specs = (
+            ("experience", "experience", build_experience),
+            ("education", "education", build_education),
+            ("skills", "skills", build_skill),
+            ("projects", "projects", build_project),
+            ("publications", "publications", build_publication),
+            ("selected_honors", "honors", build_single_field("bullet")),
+            ("patents", "patents", build_single_field("number")),
+            ("invited_talks", "talks", build_single_field("reversed_number")),
+        )
+        for rendercv_key, data_key, build_entry in section_specs:
+            entries = [
+                entry
+                for entry in map(build_entry, cv_data.get(data_key) or ())
+                if entry
             ]
-            if talk_entries:
-                available_sections["invited_talks"] = talk_entries
-
-        section_key_map = {
-            "summary": "Summary",
-            "experience": "experience",
-            "education": "education",
-            "skills": "skills",
-            "projects": "projects",
-            "publications": "publications",
-            "honors": "selected_honors",
-            "selected_honors": "selected_honors",
-            "patents": "patents",
-            "talks": "invited_talks",
-            "invited_talks": "invited_talks",
-        }
+            if entries:
+                available_sections[rendercv_key] = entries
 
         ordered_sections = {}
         if "Summary" in available_sections:
             ordered_sections["Summary"] = available_sections["Summary"]
 
-        ordered_section_ids = section_order or []
-        ordered_rendercv_keys = [
-            section_key_map.get(section_id, section_id)
-            for section_id in ordered_section_ids
-        ]
-
-        for index, section_id in enumerate(ordered_section_ids):
-            rendercv_key = section_key_map.get(section_id, section_id)
-            if rendercv_key == "Summary":
-                continue
+        for section_id in section_order or ():
+            rendercv_key = cls.SECTION_KEY_MAP.get(section_id, section_id)
             if rendercv_key in available_sections and rendercv_key not in ordered_sections:
                 ordered_sections[rendercv_key] = available_sections[rendercv_key]
 
@@ -663,10 +740,22 @@ class CVService:
             if rendercv_key not in ordered_sections:
                 ordered_sections[rendercv_key] = entries
         
-        # Add sections to CV
-        if ordered_sections:
-            cv_section["sections"] = ordered_sections
-        
+        # Build CV section - use rendercv v2.x field names, omitting empty fields
+        cv_section = {
+            key: value
+            for key, value in (
+                ("name", name or "Your Name"),
+                ("headline", headline),
+                ("email", email),
+                ("phone", phone),
+                ("location", location),
+                ("website", website),
+                ("social_networks", social_networks),
+                ("sections", ordered_sections),
+            )
+            if value
+        }
+
         design = {
             "theme": cls.resolve_theme(theme),
         }
@@ -674,13 +763,7 @@ class CVService:
         design_settings = design_settings or {}
         primary_color = clean_string(design_settings.get("primaryColor"))
         if primary_color:
-            design["colors"] = {
-                "name": primary_color,
-                "headline": primary_color,
-                "connections": primary_color,
-                "section_titles": primary_color,
-                "links": primary_color,
-            }
+            design["colors"] = dict.fromkeys(cls.DESIGN_COLOR_KEYS, primary_color)
 
         font_family = clean_string(design_settings.get("fontFamily"))
         if font_family:
@@ -1,5 +1,9 @@
+import asyncio
+import json
 import sys
+from collections import OrderedDict
 from pathlib import Path
+from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 
@@ -8,6 +12,7 @@ if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
 from main import app
+from services import ai_service
 from services.ai_service import AIService, clean_plain_text
 
 
@@ -58,7 +63,11 @@ def test_ai_suggest_validates_unknown_type() -> None:
 
 def test_ai_suggest_falls_back_for_empty_provider_response(monkeypatch) -> None:
     monkeypatch.setattr(AIService, "is_configured", staticmethod(lambda: True))
-    monkeypatch.setattr(AIService, "call_provider", staticmethod(lambda **kwargs: ""))
+
+    async def empty_provider_response(**kwargs) -> str:
+        return ""
+
+    monkeypatch.setattr(AIService, "call_provider", staticmethod(empty_provider_response))
     client = TestClient(app)
 
     response = client.post(
@@ -115,3 +124,109 @@ def test_clean_plain_text_removes_markdown_formatting() -> None:
     result = clean_plain_text('```markdown\n- **Improved** `API` latency\n```')
 
     assert result == "Improved API latency"
+
+
+def fake_provider_client(replies: list[str], calls: list[dict]) -> SimpleNamespace:
+    async def create(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0)
+        message = SimpleNamespace(content=replies[min(len(calls), len(replies)) - 1])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_call_provider_coalesces_identical_in_flight_prompts(monkeypatch) -> None:
+    calls: list[dict] = []
+    monkeypatch.setattr(ai_service, "_response_cache", OrderedDict())
+    monkeypatch.setattr(ai_service, "_pending_responses", {})
+    monkeypatch.setattr(ai_service, "get_client", lambda: fake_provider_client(["Shared suggestion text"], calls))
+
+    async def run() -> list[str]:
+        first, second = await asyncio.gather(
+            AIService.call_provider("Share me", max_tokens=40),
+            AIService.call_provider("Share me", max_tokens=40),
+        )
+        return [first, second]
+
+    assert asyncio.run(run()) == ["Shared suggestion text"] * 2
+    assert len(calls) == 1
+
+    # Replies are only cached once a caller accepts them
+    assert asyncio.run(AIService.call_provider("Share me", max_tokens=40)) == "Shared suggestion text"
+    assert len(calls) == 2
+
+
+def test_suggest_caches_only_accepted_replies(monkeypatch) -> None:
+    calls: list[dict] = []
+    replies = ["TODO", "Senior Platform Engineer", "Unused reply"]
+    monkeypatch.setattr(ai_service, "_response_cache", OrderedDict())
+    monkeypatch.setattr(ai_service, "_pending_responses", {})
+    monkeypatch.setattr(AIService, "is_configured", staticmethod(lambda: True))
+    monkeypatch.setattr(ai_service, "get_client", lambda: fake_provider_client(replies, calls))
+
+    async def run() -> list[str]:
+        return [(await AIService.suggest("headline", "Platform engineer")).source for _ in range(3)]
+
+    assert asyncio.run(run()) == ["fallback", "ai", "ai"]
+    assert len(calls) == 2
+
+
+def test_cover_letters_are_never_served_from_cache(monkeypatch) -> None:
+    calls: list[dict] = []
+    monkeypatch.setattr(ai_service, "_response_cache", OrderedDict())
+    monkeypatch.setattr(ai_service, "_pending_responses", {})
+    monkeypatch.setattr(AIService, "is_configured", staticmethod(lambda: True))
+    monkeypatch.setattr(ai_service, "get_client", lambda: fake_provider_client(["Dear team"], calls))
+
+    async def run() -> None:
+        await AIService.suggest("cover_letter", "Write a letter")
+        await AIService.suggest("cover_letter", "Write a letter")
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert not ai_service._response_cache
+
+
+def test_clean_plain_text_strips_only_wrapping_quotes() -> None:
+    assert clean_plain_text('"Led platform migration"') == "Led platform migration"
+    assert clean_plain_text("'Led platform migration'") == "Led platform migration"
+    assert clean_plain_text('Won the "Best Paper" award') == 'Won the "Best Paper" award'
+    assert clean_plain_text('"') == '"'
+
+
+def test_ai_suggest_keeps_formatted_honor_without_provider_call(monkeypatch) -> None:
+    monkeypatch.setattr(AIService, "is_configured", staticmethod(lambda: True))
+
+    async def unexpected_provider_call(**kwargs) -> str:
+        raise AssertionError("provider should not be called")
+
+    monkeypatch.setattr(AIService, "call_provider", staticmethod(unexpected_provider_call))
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/ai/suggest",
+        json={"type": "honor", "text": "Best Paper Award, NeurIPS 2023", "context": ""},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["suggestion"] == "Best Paper Award, NeurIPS 2023"
+    assert payload["warnings"] == []
+
+
+def test_ai_suggest_stream_emits_fallback_events_when_unconfigured(monkeypatch) -> None:
+    monkeypatch.setattr(AIService, "is_configured", staticmethod(lambda: False))
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/ai/suggest/stream",
+        json={"type": "bullet", "text": "reduced API latency", "context": "Backend Engineer"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [event for event in response.text.split("\n\n") if event]
+    assert events[-1] == "event: done\ndata: {}"
+    first = json.loads(events[0].removeprefix("data: "))
+    assert first["text"].startswith("Delivered reduced API latency")
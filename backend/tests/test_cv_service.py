@@ -1,6 +1,11 @@
+import queue
+import shutil
 import sys
+import tempfile
+from collections import OrderedDict
 from pathlib import Path
 
+import pytest
 import yaml
 from fastapi.testclient import TestClient
 
@@ -9,6 +14,7 @@ if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
 from main import app
+from services import cv_service
 from services.cv_service import CVService
 
 
@@ -71,7 +77,7 @@ def sample_cv_data() -> dict:
 
 
 def test_build_yaml_maps_frontend_fields_and_applies_section_order() -> None:
-    result = CVService._build_yaml_structure(
+    result = CVService.build_structure(
         sample_cv_data(),
         "classic",
         {"primaryColor": "#004F90", "fontFamily": "Source Sans 3"},
@@ -112,7 +118,7 @@ def test_build_yaml_maps_frontend_fields_and_applies_section_order() -> None:
 
 
 def test_build_yaml_does_not_duplicate_project_link_highlight() -> None:
-    result = CVService._build_yaml_structure(
+    result = CVService.build_structure(
         {
             "name": "Link User",
             "projects": [
@@ -139,7 +145,7 @@ def test_build_yaml_does_not_duplicate_project_link_highlight() -> None:
 
 
 def test_build_yaml_omits_empty_or_incomplete_draft_entries() -> None:
-    result = CVService._build_yaml_structure(
+    result = CVService.build_structure(
         {
             "name": "Draft User",
             "experience": [{"company": "Acme", "position": ""}],
@@ -160,7 +166,7 @@ def test_build_yaml_omits_empty_or_incomplete_draft_entries() -> None:
 
 
 def test_build_yaml_normalizes_common_editor_dates() -> None:
-    result = CVService._build_yaml_structure(
+    result = CVService.build_structure(
         {
             "name": "Date User",
             "experience": [
@@ -183,7 +189,7 @@ def test_build_yaml_normalizes_common_editor_dates() -> None:
 
 
 def test_build_yaml_normalizes_pakistan_local_mobile_number() -> None:
-    result = CVService._build_yaml_structure(
+    result = CVService.build_structure(
         {
             "name": "Phone User",
             "phone": "03007038803",
@@ -198,7 +204,7 @@ def test_build_yaml_normalizes_pakistan_local_mobile_number() -> None:
 
 
 def test_build_yaml_omits_invalid_phone_instead_of_breaking_preview() -> None:
-    result = CVService._build_yaml_structure(
+    result = CVService.build_structure(
         {
             "name": "Phone User",
             "phone": "not a phone",
@@ -212,13 +218,13 @@ def test_build_yaml_omits_invalid_phone_instead_of_breaking_preview() -> None:
 
 
 def test_build_yaml_resolves_ats_template_aliases() -> None:
-    jake_result = CVService._build_yaml_structure(
+    jake_result = CVService.build_structure(
         {"name": "Alias User"},
         "jake",
         {},
         [],
     )
-    sheets_result = CVService._build_yaml_structure(
+    sheets_result = CVService.build_structure(
         {"name": "Alias User"},
         "sheets",
         {},
@@ -293,14 +299,18 @@ def test_themes_endpoint_returns_all_builtin_theme_metadata() -> None:
     assert sheets_theme["renderTheme"] == "engineeringresumes"
 
 
-def test_preview_endpoint_accepts_ats_template_alias(monkeypatch) -> None:
+def test_preview_endpoint_accepts_ats_template_alias(monkeypatch, tmp_path) -> None:
     captured: dict[str, object] = {}
+    render_dir = tmp_path / "render"
+    render_dir.mkdir()
+    png_path = render_dir / "Alias_CV_1.png"
+    png_path.write_bytes(b"png-data")
 
-    def fake_render_cv(**kwargs):
+    def fake_render_cv_file(**kwargs):
         captured.update(kwargs)
-        return b"png-data", "Alias_CV.png"
+        return png_path, "Alias_CV.png", render_dir
 
-    monkeypatch.setattr(CVService, "render_cv", fake_render_cv)
+    monkeypatch.setattr(CVService, "render_cv_file", fake_render_cv_file)
     client = TestClient(app)
 
     response = client.post(
@@ -315,7 +325,9 @@ def test_preview_endpoint_accepts_ats_template_alias(monkeypatch) -> None:
 
     assert response.status_code == 200
     assert response.headers["content-type"] == "image/png"
+    assert response.content == b"png-data"
     assert captured["theme"] == "jake"
+    assert not render_dir.exists()
 
 
 def test_yaml_endpoint_maps_ats_template_alias_to_rendercv_theme() -> None:
@@ -333,3 +345,148 @@ def test_yaml_endpoint_maps_ats_template_alias_to_rendercv_theme() -> None:
     assert response.status_code == 200
     yaml_payload = yaml.safe_load(response.json()["yaml"])
     assert yaml_payload["design"]["theme"] == "engineeringresumes"
+
+
+def test_yaml_endpoint_keeps_sparse_entries_and_present_end_date() -> None:
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/yaml",
+        json={
+            "cv_data": {
+                "name": "Sparse User",
+                "experience": [{"company": "Acme", "position": "Engineer", "start_date": "2021-01"}],
+            },
+            "theme": "classic",
+            "section_order": ["experience"],
+        },
+    )
+
+    assert response.status_code == 200
+    yaml_payload = yaml.safe_load(response.json()["yaml"])
+    entry = yaml_payload["cv"]["sections"]["experience"][0]
+    assert entry["end_date"] == "present"
+    assert "highlights" not in entry
+
+
+def test_render_cv_file_reports_invalid_data_and_cleans_up(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr("services.cv_service._render_root", lambda: tmp_path)
+    monkeypatch.setattr("services.cv_service._scratch_dirs", queue.LifoQueue(maxsize=4))
+    monkeypatch.setattr(CVService, "discard_render_dir", staticmethod(shutil.rmtree))
+
+    with pytest.raises(ValueError, match="cv.email"):
+        CVService.render_cv_file({"name": "Bad Email", "email": "not-an-email"}, output_format="pdf")
+
+    assert not any(tmp_path.iterdir())
+
+
+def test_render_cv_file_reuses_model_and_typst_for_repeated_input(monkeypatch) -> None:
+    monkeypatch.setattr(cv_service, "_render_cache", OrderedDict())
+    typst_calls = []
+    real_render_full_template = cv_service.render_full_template
+
+    def counting_render_full_template(model, file_type):
+        typst_calls.append(model)
+        return real_render_full_template(model, file_type)
+
+    def fake_compile_typst(typst_source, output_path, output_format):
+        output_path.write_bytes(typst_source)
+        return output_path
+
+    monkeypatch.setattr(cv_service, "render_full_template", counting_render_full_template)
+    monkeypatch.setattr(CVService, "_compile_typst", staticmethod(fake_compile_typst))
+
+    first_path, _, first_dir = CVService.render_cv_file(sample_cv_data(), output_format="pdf")
+    second_path, filename, second_dir = CVService.render_cv_file(sample_cv_data(), output_format="pdf")
+
+    assert len(typst_calls) == 1
+    assert first_dir != second_dir
+    assert second_path.is_relative_to(second_dir)
+    assert second_path.read_bytes() == first_path.read_bytes()
+    assert filename == "A_User_CV.pdf"
+    shutil.rmtree(first_dir)
+    shutil.rmtree(second_dir)
+
+
+def test_compile_typst_reuses_the_thread_compiler() -> None:
+    job_dir = Path(tempfile.mkdtemp(dir=cv_service._render_root()))
+
+    png_path = CVService._compile_typst(b"= Hello", job_dir / "cv.png", "png")
+    compiler = CVService._typst_compiler()
+    pdf_path = CVService._compile_typst(b"= Hello", job_dir / "cv.pdf", "pdf")
+
+    assert CVService._typst_compiler() is compiler
+    assert png_path.read_bytes().startswith(b"\x89PNG")
+    assert pdf_path.read_bytes().startswith(b"%PDF")
+    shutil.rmtree(job_dir)
+
+
+def test_render_dirs_are_emptied_and_reused(monkeypatch) -> None:
+    monkeypatch.setattr("services.cv_service._scratch_dirs", queue.LifoQueue(maxsize=4))
+    job_dir = CVService.acquire_render_dir()
+    (job_dir / "cv.typ").write_text("= Hello", encoding="utf-8")
+    (job_dir / "nested").mkdir()
+
+    CVService.recycle_render_dir(job_dir)
+
+    reused_dir = CVService.acquire_render_dir()
+    assert reused_dir == job_dir
+    assert not any(reused_dir.iterdir())
+    CVService.recycle_render_dir(reused_dir)
+
+
+def test_build_structure_is_cached_per_payload() -> None:
+    cv_data = sample_cv_data()
+    reordered = dict(reversed(list(cv_data.items())))
+
+    first = CVService.build_structure(cv_data, "classic", None, ["education", "experience"])
+    same = CVService.build_structure(reordered, "classic", None, ["education", "experience"])
+    other_order = CVService.build_structure(cv_data, "classic", None, ["experience", "education"])
+
+    assert same is first
+    assert other_order is not first
+    assert list(other_order["cv"]["sections"]) != list(first["cv"]["sections"])
+
+
+def test_preview_endpoint_sends_non_latin_filenames(monkeypatch, tmp_path) -> None:
+    png_path = tmp_path / "cv.png"
+    png_path.write_bytes(b"png-data")
+    render_dir = tmp_path / "render"
+    render_dir.mkdir()
+
+    monkeypatch.setattr(
+        CVService,
+        "render_cv_file",
+        lambda **kwargs: (png_path, "محمد_CV.png", render_dir),
+    )
+    client = TestClient(app)
+
+    response = client.post("/api/preview", json={"cv_data": {"name": "محمد"}, "format": "png"})
+
+    assert response.status_code == 200
+    disposition = response.headers["content-disposition"]
+    assert 'filename="CV.png"' in disposition
+    assert "filename*=UTF-8''%D9%85%D8%AD%D9%85%D8%AF_CV.png" in disposition
+    assert not render_dir.exists()
+
+
+def test_preview_endpoint_discards_render_dir_when_response_fails(monkeypatch, tmp_path) -> None:
+    render_dir = tmp_path / "render"
+    render_dir.mkdir()
+
+    def broken_disposition(filename):
+        raise ValueError("bad header")
+
+    monkeypatch.setattr(
+        CVService,
+        "render_cv_file",
+        lambda **kwargs: (render_dir / "cv.png", "CV.png", render_dir),
+    )
+    monkeypatch.setattr(CVService, "discard_render_dir", staticmethod(shutil.rmtree))
+    monkeypatch.setattr("api.render._content_disposition", broken_disposition)
+    client = TestClient(app)
+
+    response = client.post("/api/preview", json={"cv_data": {"name": "A User"}, "format": "png"})
+
+    assert response.status_code == 500
+    assert not render_dir.exists()